@@ -3,7 +3,11 @@
 # Description: Very basic chess game. Takes input from user to determine move for both sides.
 # The game ends when one player's king is captured; some other standard chess rules may not apply.
 
+import argparse
+
 from piece_classes import *
+from zobrist import BLACK_TO_MOVE_KEY, piece_key
+from evaluation import piece_score
 
 
 class InvalidStateError(Exception):
@@ -11,26 +15,84 @@ class InvalidStateError(Exception):
     pass
 
 
+class InvalidFenError(ValueError):
+    """Exception class for a FEN string that does not describe a position"""
+    pass
+
+
+# byte codes used by snapshot(); code 0 is an empty square and pawns that still have their first move get their own
+# code, so a whole position fits in 64 square bytes plus one byte for the player turn and game state
+SNAPSHOT_PIECES = [None] + [(piece_type, color, False) for color in ('WHITE', 'BLACK')
+                            for piece_type in (Pawn, Rook, Knight, Bishop, Queen, King)] + \
+                  [(Pawn, 'WHITE', True), (Pawn, 'BLACK', True)]
+SNAPSHOT_CODES = {entry: code for code, entry in enumerate(SNAPSHOT_PIECES) if entry is not None}
+GAME_STATES = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON')
+
+# FEN piece letters, uppercase for WHITE. Pawns never move backwards or sideways, so a pawn on its home rank has
+# never moved and no extra field is needed for the first-move flag. Castling, en passant and the move clocks do not
+# exist in this game; to_fen() writes them as '- - 0 1' and from_fen() ignores them.
+FEN_PIECES = {'P': (Pawn, 'WHITE'), 'R': (Rook, 'WHITE'), 'N': (Knight, 'WHITE'), 'B': (Bishop, 'WHITE'),
+              'Q': (Queen, 'WHITE'), 'K': (King, 'WHITE'), 'p': (Pawn, 'BLACK'), 'r': (Rook, 'BLACK'),
+              'n': (Knight, 'BLACK'), 'b': (Bishop, 'BLACK'), 'q': (Queen, 'BLACK'), 'k': (King, 'BLACK')}
+FEN_LETTERS = {entry: letter for letter, entry in FEN_PIECES.items()}
+PAWN_HOME_ROWS = {'WHITE': 6, 'BLACK': 1}    # rows (0 = rank 8) of each color's pawns before their first move
+START_FEN = 'rnbkqbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1'    # black King and Queen start swapped here
+
+# results of check_move(), and the messages printed for them when the game is not headless
+MOVE_MESSAGES = {
+    'OK': '',
+    'GAME_OVER': 'The game is over, no more moves can be made.',
+    'NO_PIECE': 'There is no piece at the starting square, please try again.',
+    'WRONG_TURN': 'That piece belongs to the other player, please try again.',
+    'ILLEGAL_MOVE': 'That move is unavailable for the given piece, please try again.'
+}
+
+
 class ChessGame:
     """Manages the general game logic for us, including the game state, player turn, move validation."""
-    def __init__(self):
+    def __init__(self, move_cache=None, headless=False):
         """init method with items we initialize from the beginning, including the game state, player turn, the board,
-        an empty piece dictionary, and a board layout which will be defined immediately after this method."""
+        an empty piece dictionary, and a board layout which will be defined immediately after this method.
+        Passing a MoveCache (which may be shared between games) lets move validation reuse moves already generated
+        for the same position. A headless game never prints: make_move does not display the board and invalid moves
+        are only reported through check_move() result codes."""
+        self._init_state(move_cache, headless)
+        for position, piece in self._board_start().items():
+            self._place_piece(SQUARE_INDEX[position], piece)
+
+    @classmethod
+    def _empty(cls, move_cache=None, headless=False):
+        """Creates a game with no pieces on the board, WHITE to move, for loaders that place their own pieces. Skips
+        building and then clearing the starting position."""
+        game = cls.__new__(cls)
+        game._init_state(move_cache, headless)
+        return game
+
+    def _init_state(self, move_cache, headless):
+        """Sets up the game state, player turn and the empty board structures shared by __init__ and _empty."""
         self._game_state = 'UNFINISHED'
         self._player_turn = 'WHITE'
         self._pieces = {}
-        self._init_pos = {}    # represents both the initial layout and the current state of the board
-        self._board_start()
+        self._squares = [None] * 64    # the pieces indexed by square number; None marks an empty square
+        # each color's pieces by type, as square index -> piece dictionaries kept up to date on every move
+        self._piece_lists = {color: {piece_type: {} for piece_type in (Pawn, Knight, Bishop, Rook, Queen, King)}
+                             for color in ('WHITE', 'BLACK')}
+        self._king_squares = {'WHITE': None, 'BLACK': None}    # None once a King has been captured
+        self._key = 0    # Zobrist key of the position, updated incrementally on every move
+        self._score = 0    # material and piece-square evaluation from WHITE's side, also updated on every move
+        self._undo_stack = []    # one entry per pushed move, so moves can be taken back with pop()
+        self._move_cache = move_cache
+        self._headless = headless
 
     def _board_start(self):
-        """Initializes all pieces and their starting positions on the board.
-        The _init_pos dictionary functions as both a container for all pieces and the live board state."""
+        """Initializes all pieces and returns their starting positions as a dictionary keyed by chess notation, which
+        __init__ places on the board. The live board is _squares; notation is only used at the edges of the game."""
         self._pieces = {
             'r': '\u265C', 'kn': '\u265E', 'b': '\u265D', 'q': '\u265B', 'k': '\u265A', 'p': '\u265F',
             'R': '\u2656', 'KN': '\u2658', 'B': '\u2657', 'Q': '\u2655', 'K': '\u2654', 'P': '\u2659', 'sp': ' '
         }
 
-        self._init_pos = {
+        return {
             'a8': Rook('BLACK', 'a8', self), 'b8': Knight('BLACK', 'b8', self),
             'c8': Bishop('BLACK', 'c8', self), 'd8': King('BLACK', 'd8', self),
             'e8': Queen('BLACK', 'e8', self), 'f8': Bishop('BLACK', 'f8', self),
@@ -52,15 +114,112 @@ class ChessGame:
             'g1': Knight('WHITE', 'g1', self), 'h1': Rook('WHITE', 'h1', self)
         }
 
+    def snapshot(self):
+        """Returns the position as 65 bytes: one piece code per square (in SQUARE_INDEX order) followed by a byte
+        holding the player turn (bit 0 set for BLACK) and the game state (bits 1-2). Snapshots are cheap to store,
+        hash, compare and send to other processes, and from_snapshot() turns one back into a game."""
+        data = bytearray(65)
+        for square, piece in enumerate(self._squares):
+            if piece is not None:
+                init_move = type(piece) is Pawn and piece._init_move
+                data[square] = SNAPSHOT_CODES[(type(piece), piece.get_color(), init_move)]
+        data[64] = (self._player_turn == 'BLACK') | (GAME_STATES.index(self._game_state) << 1)
+        return bytes(data)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, move_cache=None, headless=False):
+        """Creates a new game in the position recorded by snapshot(). The undo stack starts empty."""
+        pieces = []
+        for square, code in enumerate(snapshot[:64]):
+            if code:
+                piece_type, color, init_move = SNAPSHOT_PIECES[code]
+                pieces.append((square, piece_type, color, init_move))
+
+        game = cls._empty(move_cache, headless)
+        game._load_position(pieces, 'BLACK' if snapshot[64] & 1 else 'WHITE', GAME_STATES[snapshot[64] >> 1])
+        return game
+
+    @classmethod
+    def from_fen(cls, fen, move_cache=None, headless=False):
+        """Creates a new game in the position described by a FEN string such as START_FEN. Only the piece placement
+        and side to move fields are used. If one King is missing the game is already won by the other player.
+        Raises InvalidFenError if the string cannot be read."""
+        fields = fen.split()
+        if len(fields) < 2 or fields[1] not in ('w', 'b'):
+            raise InvalidFenError(f"Expected piece placement and side to move (w or b): {fen!r}")
+        ranks = fields[0].split('/')
+        if len(ranks) != 8:
+            raise InvalidFenError(f"Expected 8 ranks separated by '/': {fen!r}")
+
+        pieces = []
+        for row, rank in enumerate(ranks):
+            col = 0
+            for char in rank:
+                if char in '12345678':
+                    col += int(char)
+                elif char in FEN_PIECES and col < 8:
+                    piece_type, color = FEN_PIECES[char]
+                    init_move = piece_type is Pawn and row == PAWN_HOME_ROWS[color]
+                    pieces.append((row * 8 + col, piece_type, color, init_move))
+                    col += 1
+                else:
+                    raise InvalidFenError(f"Unexpected {char!r} in rank {8 - row}: {fen!r}")
+            if col != 8:
+                raise InvalidFenError(f"Rank {8 - row} does not cover 8 squares: {fen!r}")
+
+        kings = [color for _, piece_type, color, _ in pieces if piece_type is King]
+        if kings == ['WHITE'] or kings == ['BLACK']:
+            game_state = kings[0] + '_WON'
+        elif sorted(kings) == ['BLACK', 'WHITE']:
+            game_state = 'UNFINISHED'
+        else:
+            raise InvalidFenError(f"Expected one King per side: {fen!r}")
+
+        game = cls._empty(move_cache, headless)
+        game._load_position(pieces, 'WHITE' if fields[1] == 'w' else 'BLACK', game_state)
+        return game
+
+    def to_fen(self):
+        """Returns the position as a FEN string that from_fen() reads back to the same position."""
+        ranks = []
+        for row in range(8):
+            rank = ''
+            empty = 0
+            for piece in self._squares[row * 8:row * 8 + 8]:
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank += str(empty)
+                    empty = 0
+                rank += FEN_LETTERS[(type(piece), piece.get_color())]
+            ranks.append(rank + (str(empty) if empty else ''))
+        return f"{'/'.join(ranks)} {'w' if self._player_turn == 'WHITE' else 'b'} - - 0 1"
+
+    def _load_position(self, pieces, player_turn, game_state='UNFINISHED'):
+        """Replaces the whole position with the given pieces, each a (square index, piece class, color, init_move)
+        tuple such as (52, Pawn, 'WHITE', True), and sets the player turn and game state. Clears the undo stack."""
+        for square, piece in enumerate(self._squares):
+            if piece is not None:
+                self._remove_piece(square)
+        for square, piece_type, color, init_move in pieces:
+            piece = piece_type(color, SQUARE_NAMES[square], self)
+            piece._init_move = init_move
+            self._place_piece(square, piece)
+
+        if self._player_turn != player_turn:
+            self.toggle_turn()
+        self.set_game_state(game_state)
+        self._undo_stack = []
+
     def display_board(self):
         """Displays a visual representation of the board and each piece's position using Unicode symbols."""
         display_board = [[' ' for _ in range(8)] for _ in range(8)]
 
-        # build visual board from current piece positions in _init_pos
-        for position, piece in self._init_pos.items():
-            col, row = ChessGame.coord_to_index(position)
-            # print(f"[{position}] {piece.__class__.__name__} ({piece.get_color()}) → {piece.unicode()}")
-            display_board[row][col] = piece.unicode()
+        # build visual board from current piece positions in _squares (square = row * 8 + col)
+        for square, piece in enumerate(self._squares):
+            if piece is not None:
+                display_board[square // 8][square % 8] = piece.unicode()
 
         print("   A B C D E F G H")
         row_num = 8
@@ -102,6 +261,32 @@ class ChessGame:
     def get_player_turn(self):
         return self._player_turn
 
+    def position_key(self):
+        """Returns the 64-bit Zobrist key of the current position (piece placement, side to move and which pawns still
+        have their first move). Equal positions always have equal keys."""
+        return self._key
+
+    def get_score(self):
+        """Returns the material and piece-square evaluation of the position in centipawns from WHITE's point of view
+        (see evaluation.py). It is updated as pieces move rather than recomputed."""
+        return self._score
+
+    def get_mailbox(self):
+        """Returns the list of 64 squares (numbered as in SQUARE_INDEX) holding a piece or None. Pieces read it
+        during move generation; it must not be modified directly."""
+        return self._squares
+
+    @staticmethod
+    def square_index(pos):
+        """Converts a square given as an index, a (col, row) tuple or chess notation like 'e2' into its square index,
+        or None if it is off the board. This is where notation enters the integer square model."""
+        if isinstance(pos, int):
+            return pos if 0 <= pos < 64 else None
+        if isinstance(pos, tuple):
+            col, row = pos
+            return row * 8 + col if 0 <= col < 8 and 0 <= row < 8 else None
+        return SQUARE_INDEX.get(pos.lower())
+
     @staticmethod
     def coord_to_index(coord_str):
         """Converts chess notation (e.g., 'e2') into zero-indexed (col, row) coordinates for internal list access."""
@@ -121,38 +306,118 @@ class ChessGame:
         return position
 
     def make_move(self, move_from, move_to):
-        if self._game_state != 'UNFINISHED':
+        """Plays a move for the player whose turn it is if it is valid, then displays the board unless the game is
+        headless. Returns True if the move was made."""
+        result = self.check_move(move_from, move_to)
+        if result != 'OK':
+            if result == 'ILLEGAL_MOVE':
+                self._report(result)
+                self._report('That is not a valid move, please try again.')
             return False
 
-        piece = self.get_piece(move_from)
-        target_piece = self.get_piece(move_to)
+        self.push((move_from, move_to))
+        if not self._headless:
+            self.display_board()
 
-        if not piece or piece.get_color() != self._player_turn:
-            return False
+        return True
 
-        if not self.is_valid_move(move_from, move_to):
-            print('That is not a valid move, please try again.')
-            return False
+    def check_move(self, move_from, move_to):
+        """Checks a move without printing anything or changing the game, returning 'OK' if make_move would accept it,
+        or 'GAME_OVER', 'NO_PIECE', 'WRONG_TURN' or 'ILLEGAL_MOVE' explaining why not (see MOVE_MESSAGES)."""
+        if self._game_state != 'UNFINISHED':
+            return 'GAME_OVER'
 
-        from_square = self.index_to_coord(*move_from)
-        to_square = self.index_to_coord(*move_to)
+        piece = self.get_piece(move_from)
+        if piece is None:
+            return 'NO_PIECE'
+        if piece.get_color() != self._player_turn:
+            return 'WRONG_TURN'
+        if self.square_index(move_to) not in self._valid_squares(piece):
+            return 'ILLEGAL_MOVE'
+        return 'OK'
+
+    def validate_moves(self, pairs):
+        """Checks a list of (move_from, move_to) pairs against the current position in one call and returns a list
+        with the check_move() result for each. Moves for each origin square are generated only once, however many
+        pairs share it."""
+        if self._game_state != 'UNFINISHED':
+            return ['GAME_OVER'] * len(pairs)
+
+        generated = {}    # origin square index -> set of destination square indexes
+        results = []
+        for move_from, move_to in pairs:
+            square = self.square_index(move_from)
+            piece = self._squares[square] if square is not None else None
+            if piece is None:
+                results.append('NO_PIECE')
+            elif piece._color != self._player_turn:
+                results.append('WRONG_TURN')
+            else:
+                targets = generated.get(square)
+                if targets is None:
+                    targets = generated[square] = set(self._valid_squares(piece))
+                results.append('OK' if self.square_index(move_to) in targets else 'ILLEGAL_MOVE')
+        return results
+
+    def _report(self, message):
+        """Prints a message for the player, given either as a check_move() result or as text, unless headless."""
+        if not self._headless:
+            print(MOVE_MESSAGES.get(message, message))
+
+    def push(self, move):
+        """Silently plays a move and records what is needed to take it back on the undo stack. The move is either an
+        encoded move from generate_moves() or a (move_from, move_to) pair of square indexes, (col, row) tuples or
+        chess notation strings. The move is not validated, so it should come from generate_moves() or a piece's
+        valid_moves()."""
+        if type(move) is int:
+            from_square = move & 63
+            to_square = move >> 6 & 63
+        else:
+            move_from, move_to = move
+            from_square = move_from if type(move_from) is int else self.square_index(move_from)
+            to_square = move_to if type(move_to) is int else self.square_index(move_to)
+
+        self._undo_stack.append((from_square, to_square, self._squares[to_square],
+                                 self._squares[from_square]._init_move, self._game_state, self._player_turn))
+        self._apply_move(from_square, to_square)
+
+    def pop(self):
+        """Takes back the last pushed move, restoring any captured piece, the moved piece's first-move flag, the game
+        state and the player turn exactly. Returns the (from, to) square indexes of the move taken back."""
+        from_square, to_square, captured, init_move, game_state, player_turn = self._undo_stack.pop()
+
+        piece = self._remove_piece(to_square)
+        piece._square = from_square
+        piece._init_move = init_move
+        self._place_piece(from_square, piece)
+        if captured is not None:
+            self._place_piece(to_square, captured)
+
+        self._game_state = game_state
+        if self._player_turn != player_turn:
+            self.toggle_turn()
+        return from_square, to_square
+
+    def _apply_move(self, from_square, to_square):
+        """Moves the piece on from_square to to_square without any validation or output, capturing whatever is on
+        to_square, updating the game state if a King was captured and toggling the turn otherwise."""
+        piece = self._squares[from_square]
+        target_piece = self._squares[to_square]
 
         if isinstance(target_piece, King):
             self.set_game_state('WHITE_WON' if piece.get_color() == 'WHITE' else 'BLACK_WON')
 
-        self._init_pos.pop(from_square)
-        self._init_pos[to_square] = piece
-        piece._position = to_square
+        if target_piece is not None:
+            self._remove_piece(to_square)
+        self._remove_piece(from_square)
+        piece._square = to_square
         piece._init_move = False
-
-        self.display_board()
+        self._place_piece(to_square, piece)
 
         # only toggle turn if game is not over
         if self._game_state == 'UNFINISHED':
             self.toggle_turn()
 
-        return True
-
     @staticmethod
     def parse_position(from_pos, to_pos):
         """Parses two coordinate strings like 'A2' and 'B3' into board indices (col, row)."""
@@ -171,18 +436,157 @@ class ChessGame:
         piece = self.get_piece(move_from)
 
         if piece is None:
-            print("There is no piece at the starting square, please try again.")
+            self._report('NO_PIECE')
             return False
 
-        valid_moves = piece.valid_moves()
-        target_square = self.index_to_coord(*move_to)
-
-        if target_square not in valid_moves:
-            print('That move is unavailable for the given piece, please try again.')
+        if self.square_index(move_to) not in self._valid_squares(piece):
+            self._report('ILLEGAL_MOVE')
             return False
 
         return True
 
+    def get_valid_moves(self, pos):
+        """Returns the destination squares in chess notation for the piece at pos (a (col, row) tuple or a string
+        like 'e2'), or an empty list if the square is empty. Uses the move cache when the game has one."""
+        piece = self.get_piece(pos)
+        if piece is None:
+            return []
+        return [SQUARE_NAMES[square] for square in self._valid_squares(piece)]
+
+    def _valid_squares(self, piece):
+        """Returns the destination square indexes for a piece on the board, from the move cache when possible."""
+        if self._move_cache is None:
+            return piece.valid_squares()
+
+        squares = self._move_cache.get(self._key, piece._square)
+        if squares is None:
+            squares = tuple(piece.valid_squares())
+            self._move_cache.store(self._key, piece._square, squares)
+        return squares
+
+    def get_player_moves(self):
+        """Returns every (from, to) move for the player whose turn it is, e.g. ('e2', 'e4'). A finished game has no
+        moves, since the game ends as soon as a King is captured."""
+        return [(SQUARE_NAMES[move_from], SQUARE_NAMES[move_to]) for move_from, move_to in self.get_move_squares()]
+
+    def get_move_squares(self):
+        """Returns every move for the player whose turn it is as (from, to) square index pairs, e.g. (52, 36) for
+        e2 to e4."""
+        buffer = [0] * MAX_MOVES
+        count = self.generate_moves(buffer)
+        return [(buffer[index] & 63, buffer[index] >> 6 & 63) for index in range(count)]
+
+    def generate_moves(self, buffer):
+        """Writes every move for the player whose turn it is into buffer, a preallocated list (or array) with room
+        for MAX_MOVES entries, and returns how many were written. Each move is one int: the from square in bits 0-5,
+        the to square in bits 6-11, plus MOVE_CAPTURE and MOVE_KING_CAPTURE flags. Only the side to move's piece list
+        is visited, and no tuples or strings are created. A finished game has no moves."""
+        if self._game_state != 'UNFINISHED':
+            return 0
+
+        count = 0
+        for pieces in self._piece_lists[self._player_turn].values():
+            for piece in pieces.values():
+                count = piece.generate_moves(buffer, count)
+        return count
+
+    def generate_captures(self, buffer):
+        """Like generate_moves, but writes only the captures. Quiet moves are never generated rather than being
+        generated and filtered out, which keeps the quiescence search cheap."""
+        if self._game_state != 'UNFINISHED':
+            return 0
+
+        count = 0
+        for pieces in self._piece_lists[self._player_turn].values():
+            for piece in pieces.values():
+                count = piece.generate_captures(buffer, count)
+        return count
+
+    def playout(self, rng, max_moves=200, buffer=None):
+        """Plays uniformly random moves, chosen with rng (a random.Random), until a King is captured, the side to
+        move has no moves, or max_moves moves have been played, and returns the resulting game state ('UNFINISHED'
+        if nobody won). The game is put back in its original position afterwards. Moves are ints written into one
+        preallocated buffer, so nothing is allocated per move besides the undo stack entry."""
+        if buffer is None:
+            buffer = [0] * MAX_MOVES
+        randrange = rng.randrange
+        generate_moves = self.generate_moves
+        push = self.push
+
+        played = 0
+        while played < max_moves:
+            count = generate_moves(buffer)
+            if count == 0:
+                break    # game over, or nothing left to move
+            push(buffer[randrange(count)])
+            played += 1
+
+        result = self._game_state
+        for _ in range(played):
+            self.pop()
+        return result
+
+    def get_pieces(self, color, piece_type=None):
+        """Returns a list of the pieces of one color still on the board, optionally only those of one type (e.g.
+        King). Read from the piece lists, so only the requested pieces are visited."""
+        if piece_type is not None:
+            return list(self._piece_lists[color][piece_type].values())
+        return [piece for pieces in self._piece_lists[color].values() for piece in pieces.values()]
+
+    def get_king_square(self, color):
+        """Returns the square index of the given color's King, or None if it has been captured."""
+        return self._king_squares[color]
+
+    def is_king_attacked(self, color):
+        """Returns True if the given color's King could be captured by the other player's next move."""
+        square = self._king_squares[color]
+        if square is None:
+            return False
+        return self.is_square_attacked(square, 'BLACK' if color == 'WHITE' else 'WHITE')
+
+    def is_square_attacked(self, square, by_color):
+        """Returns True if any piece of by_color could capture on the given square (an index, (col, row) tuple or
+        notation like 'e2'). Works backwards from the square: it looks for knights and kings a step away, pawns
+        one rank behind it, and rooks, bishops or queens at the first blocker of each ray, so the other player's
+        moves are never generated. An off-board square is never attacked."""
+        square = self.square_index(square)
+        if square is None:
+            return False
+        squares = self._squares
+
+        for source in KNIGHT_MOVES[square]:
+            piece = squares[source]
+            if piece is not None and type(piece) is Knight and piece._color == by_color:
+                return True
+        for source in KING_MOVES[square]:
+            piece = squares[source]
+            if piece is not None and type(piece) is King and piece._color == by_color:
+                return True
+
+        # white pawns capture towards row 0, so one attacking this square sits a row below it, and black the reverse
+        source_row = square // 8 + (1 if by_color == 'WHITE' else -1)
+        if 0 <= source_row < 8:
+            col = square % 8
+            for source_col in (col - 1, col + 1):
+                if 0 <= source_col < 8:
+                    piece = squares[source_row * 8 + source_col]
+                    if piece is not None and type(piece) is Pawn and piece._color == by_color:
+                        return True
+
+        for rays, slider in ((ROOK_RAYS, Rook), (BISHOP_RAYS, Bishop)):
+            for ray in rays[square]:
+                for source in ray:
+                    piece = squares[source]
+                    if piece is not None:
+                        if piece._color == by_color and type(piece) in (slider, Queen):
+                            return True
+                        break
+        return False
+
+    def count_pieces(self, color, piece_type):
+        """Returns how many pieces of the given color and type are on the board."""
+        return len(self._piece_lists[color][piece_type])
+
     def toggle_turn(self):
         """This method toggles the player turn. The game always starts with WHITE going first, and then switches
         after each move until the game has concluded."""
@@ -190,23 +594,52 @@ class ChessGame:
             self._player_turn = 'BLACK'
         else:
             self._player_turn = 'WHITE'
+        self._key ^= BLACK_TO_MOVE_KEY
 
     def get_piece(self, pos):
         """Returns the piece object at a given position. Accepts either (col, row) tuples or chess notation strings
         like 'e2'. Returns None if the square is empty."""
 
-        if isinstance(pos, tuple):
-            pos = self.index_to_coord(*pos)
-        return self._init_pos.get(pos.lower())
+        square = self.square_index(pos)
+        if square is None:
+            return None
+        return self._squares[square]
+
+    def _place_piece(self, square, piece):
+        """Puts a piece on a square index, keeping _squares, the piece lists, the King squares, the position key and
+        the evaluation in sync."""
+        self._squares[square] = piece
+        self._piece_lists[piece._color][type(piece)][square] = piece
+        if type(piece) is King:
+            self._king_squares[piece._color] = square
+        self._key ^= piece_key(piece, square)
+        self._score += piece_score(piece, square)
+
+    def _remove_piece(self, square):
+        """Takes the piece off a square index, keeping _squares, the piece lists, the King squares, the position key
+        and the evaluation in sync."""
+        piece = self._squares[square]
+        self._squares[square] = None
+        del self._piece_lists[piece._color][type(piece)][square]
+        if type(piece) is King:
+            self._king_squares[piece._color] = None
+        self._key ^= piece_key(piece, square)
+        self._score -= piece_score(piece, square)
+        return piece
 
     def is_square_open(self, position):
-        """Basic check to see if a square is open or not"""
-        position = position.lower()
-        return position not in self._init_pos or self._init_pos[position] is None
+        """Basic check to see if a square (index, (col, row) tuple or notation like 'e2') is open or not"""
+        square = self.square_index(position)
+        if square is None:
+            return True
+        return self._squares[square] is None
 
     def is_opponent(self, position, color):
         """Checks if destination square is occupied by an opponent piece for potential capture"""
-        piece = self.get_piece(position)
+        square = self.square_index(position)
+        if square is None:
+            return False
+        piece = self._squares[square]
         if piece is None:
             return False
         return piece.get_color() != color  # return the one that isn't the current one == opponent
@@ -232,4 +665,21 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Very basic chess game played from the command line.')
+    parser.add_argument('--perft', type=int, metavar='DEPTH',
+                        help='count leaf nodes to DEPTH from the starting position and report nodes/second')
+    parser.add_argument('--divide', action='store_true', help='with --perft, also show the count for each root move')
+    parser.add_argument('--fen', default=START_FEN, help='with --perft, start from this FEN position instead')
+    args = parser.parse_args()
+
+    if args.perft is not None:
+        if args.perft < 0:
+            parser.error(f"--perft depth must be 0 or more, not {args.perft}")
+        try:
+            game = ChessGame.from_fen(args.fen)
+        except InvalidFenError as error:
+            parser.error(f"--fen: {error}")
+        from perft import run_perft
+        run_perft(game, args.perft, args.divide)
+    else:
+        main()
@@ -0,0 +1,219 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Batched move generation with NumPy. Holds N positions as an N x 12 array of uint64 bitboards and
+# computes move counts and destination masks for the side to move on every board at once using shifts and masks,
+# instead of calling generate_moves() piece by piece and board by board. Requires NumPy (1.x or 2.x). Running the
+# module checks it against ChessGame.generate_moves() on random positions, e.g.
+#   python3 batch_movegen.py --games 50 --seed 1
+
+import argparse
+import random
+
+import numpy as np
+
+from basic_chess import ChessGame, SNAPSHOT_PIECES, GAME_STATES
+from piece_classes import Pawn, Rook, Knight, Bishop, Queen, King, MAX_MOVES
+
+PIECE_TYPES = (Pawn, Rook, Knight, Bishop, Queen, King)
+SQUARE_BITS = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+# files (columns) on the board; bit n is square n as in piece_classes.SQUARE_INDEX, so column = n % 8
+FILE_MASKS = [np.uint64(0x0101010101010101 << col) for col in range(8)]
+
+KNIGHT_STEPS = ((2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1))
+KING_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+ROOK_STEPS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+BISHOP_STEPS = ((-1, 1), (1, 1), (-1, -1), (1, -1))
+
+
+def _popcount(boards):
+    """Returns the number of set bits in each bitboard, using np.bitwise_count where available (NumPy 2.0 and later)
+    and a shift-and-mask count otherwise."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(boards)
+    boards = boards - ((boards >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    boards = (boards & np.uint64(0x3333333333333333)) + ((boards >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    boards = (boards + (boards >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (boards * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def _shift(boards, col_step, row_step):
+    """Moves every bit in an array of bitboards by (col_step, row_step), dropping bits that leave the board
+    instead of letting them wrap onto the next row."""
+    delta = row_step * 8 + col_step
+    if delta > 0:
+        shifted = np.left_shift(boards, np.uint64(delta))
+    else:
+        shifted = np.right_shift(boards, np.uint64(-delta))
+
+    if col_step > 0:
+        for col in range(col_step):
+            shifted &= ~FILE_MASKS[col]
+    elif col_step < 0:
+        for col in range(8 + col_step, 8):
+            shifted &= ~FILE_MASKS[col]
+    return shifted
+
+
+def _slide(sliders, empty, col_step, row_step):
+    """Returns the squares reached by sliding every piece in sliders in one direction, up to and including the
+    first occupied square of each ray."""
+    flood = sliders
+    for _ in range(6):
+        flood = flood | (_shift(flood, col_step, row_step) & empty)
+    return _shift(flood, col_step, row_step)
+
+
+class BoardBatch:
+    """A batch of positions stored as NumPy arrays: an (N, 12) uint64 array with one bitboard per color and piece
+    type (white Pawn, Rook, Knight, Bishop, Queen, King, then the same for black), an (N, 2) array of pawns that
+    still have their first move, and whose turn it is on each board."""
+    def __init__(self, snapshots):
+        """Builds the batch from a list of ChessGame.snapshot() values."""
+        data = np.frombuffer(b''.join(snapshots), dtype=np.uint8).reshape(len(snapshots), 65)
+        mailboxes = data[:, :64]
+
+        self._boards = np.zeros((len(snapshots), 12), dtype=np.uint64)
+        self._unmoved_pawns = np.zeros((len(snapshots), 2), dtype=np.uint64)
+        for code, entry in enumerate(SNAPSHOT_PIECES):
+            if entry is None:
+                continue
+            piece_type, color, init_move = entry
+            color_index = 0 if color == 'WHITE' else 1
+            squares = np.bitwise_or.reduce(np.where(mailboxes == code, SQUARE_BITS, np.uint64(0)), axis=1)
+            self._boards[:, color_index * 6 + PIECE_TYPES.index(piece_type)] |= squares
+            if init_move:
+                self._unmoved_pawns[:, color_index] |= squares
+
+        self._black_to_move = (data[:, 64] & 1).astype(bool)
+        self._unfinished = (data[:, 64] >> 1) == GAME_STATES.index('UNFINISHED')
+
+    @classmethod
+    def from_games(cls, games):
+        """Builds the batch from a list of ChessGame objects."""
+        return cls([game.snapshot() for game in games])
+
+    def __len__(self):
+        return len(self._boards)
+
+    def get_boards(self):
+        """Returns the (N, 12) array of bitboards."""
+        return self._boards
+
+    def _side_to_move(self):
+        """Returns the (N, 6) bitboards of the side to move, the (N, 6) bitboards of the other side, and the
+        side to move's pawns that still have their first move."""
+        rows = np.arange(len(self._boards))
+        mover = self._black_to_move.astype(int)
+        own = self._boards.reshape(-1, 2, 6)[rows, mover]
+        other = self._boards.reshape(-1, 2, 6)[rows, 1 - mover]
+        return own, other, self._unmoved_pawns[rows, mover]
+
+    def _move_sets(self):
+        """Yields one array of destination bitboards at a time for the side to move. Within one array no two moves
+        share a destination, so summing popcounts over everything yielded gives the exact number of moves."""
+        own, other, unmoved_pawns = self._side_to_move()
+        own_all = np.bitwise_or.reduce(own, axis=1)
+        occupied = own_all | np.bitwise_or.reduce(other, axis=1)
+        empty = ~occupied
+        not_own = ~own_all
+        enemy = occupied & ~own_all
+        live = np.where(self._unfinished, ~np.uint64(0), np.uint64(0))    # finished games have no moves
+
+        pawns, rooks, knights, bishops, queens, kings = (own[:, index] for index in range(6))
+        forward = np.where(self._black_to_move, 1, -1)    # row step towards the other side's home rank
+
+        # pawns: one step onto an empty square, two steps on their first move, diagonal captures
+        for row_step in (-1, 1):
+            side = forward == row_step
+            side_pawns = np.where(side, pawns, np.uint64(0))
+            side_unmoved = np.where(side, unmoved_pawns, np.uint64(0))
+            yield _shift(side_pawns, 0, row_step) & empty & live
+            yield _shift(side_unmoved, 0, 2 * row_step) & empty & live
+            for col_step in (-1, 1):
+                yield _shift(side_pawns, col_step, row_step) & enemy & live
+
+        for col_step, row_step in KNIGHT_STEPS:
+            yield _shift(knights, col_step, row_step) & not_own & live
+        for col_step, row_step in KING_STEPS:
+            yield _shift(kings, col_step, row_step) & not_own & live
+
+        # sliding pieces on the same line cannot share a destination in the same direction, since the nearer one
+        # blocks the farther one
+        for steps, sliders in ((ROOK_STEPS, rooks | queens), (BISHOP_STEPS, bishops | queens)):
+            for col_step, row_step in steps:
+                yield _slide(sliders, empty, col_step, row_step) & not_own & live
+
+    def count_moves(self):
+        """Returns an int array with the number of moves available to the side to move on each board, matching
+        ChessGame.generate_moves()."""
+        counts = np.zeros(len(self._boards), dtype=np.int64)
+        for targets in self._move_sets():
+            counts += _popcount(targets).astype(np.int64)
+        return counts
+
+    def target_masks(self):
+        """Returns a uint64 array with, for each board, the bitboard of every square the side to move can move to."""
+        masks = np.zeros(len(self._boards), dtype=np.uint64)
+        for targets in self._move_sets():
+            masks |= targets
+        return masks
+
+
+def random_positions(games, max_plies=80, seed=0):
+    """Plays the given number of random games and returns every position reached along the way as a ChessGame
+    snapshot, starting with the initial position of each game."""
+    rng = random.Random(seed)
+    buffer = [0] * MAX_MOVES
+    snapshots = []
+    for _ in range(games):
+        game = ChessGame(headless=True)
+        snapshots.append(game.snapshot())
+        for _ in range(max_plies):
+            count = game.generate_moves(buffer)
+            if count == 0 or game.get_game_state() != 'UNFINISHED':
+                break
+            game.push(buffer[rng.randrange(count)])
+            snapshots.append(game.snapshot())
+    return snapshots
+
+
+def check_batch(snapshots):
+    """Compares count_moves() and target_masks() for a batch of snapshots with ChessGame.generate_moves() on each
+    position separately. Returns the list of snapshots where they disagree, which is empty when the batch is
+    correct."""
+    batch = BoardBatch(snapshots)
+    counts = batch.count_moves()
+    masks = batch.target_masks()
+    buffer = [0] * MAX_MOVES
+    mismatches = []
+    for index, snapshot in enumerate(snapshots):
+        game = ChessGame.from_snapshot(snapshot, headless=True)
+        count = game.generate_moves(buffer) if game.get_game_state() == 'UNFINISHED' else 0
+        mask = 0
+        for move in buffer[:count]:
+            mask |= 1 << (move >> 6 & 63)
+        if counts[index] != count or int(masks[index]) != mask:
+            mismatches.append(snapshot)
+    return mismatches
+
+
+def main():
+    """Checks the batched move generation against ChessGame on random positions and prints the result."""
+    parser = argparse.ArgumentParser(description='Check batched move generation against ChessGame.generate_moves.')
+    parser.add_argument('--games', type=int, default=50, help='number of random games to take positions from')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random games')
+    args = parser.parse_args()
+
+    snapshots = random_positions(args.games, seed=args.seed)
+    mismatches = check_batch(snapshots)
+    print(f"Positions: {len(snapshots)}")
+    print(f"Mismatches: {len(mismatches)}")
+    for snapshot in mismatches[:5]:
+        print(ChessGame.from_snapshot(snapshot, headless=True).to_fen())
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Static evaluation: material plus piece-square tables. ChessGame adds or subtracts a piece's score
+# whenever it is placed on or taken off a square, so the evaluation is always up to date without rescanning the board.
+
+from piece_classes import Pawn, Rook, Knight, Bishop, Queen, King
+
+# the King has no material value: while both are on the board they cancel out, and once one is captured the game is
+# over and the search scores the win itself
+PIECE_VALUES = {Pawn: 100, Knight: 320, Bishop: 330, Rook: 500, Queen: 900, King: 0}
+
+# bonuses in centipawns from WHITE's side, listed from a8 to h1 like SQUARE_INDEX; BLACK uses the mirrored square
+PIECE_SQUARE_TABLES = {
+    Pawn: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0
+    ],
+    Knight: [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50
+    ],
+    Bishop: [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20
+    ],
+    Rook: [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0
+    ],
+    Queen: [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20
+    ],
+    # with no check rule a King that wanders out is simply captured, so it is pushed hard towards its home rank
+    King: [
+        -80, -80, -90, -100, -100, -90, -80, -80,
+        -70, -70, -80, -90, -90, -80, -70, -70,
+        -60, -60, -70, -80, -80, -70, -60, -60,
+        -50, -50, -60, -70, -70, -60, -50, -50,
+        -40, -50, -50, -60, -60, -50, -50, -40,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        10, 20, 10, 0, 0, 10, 20, 10
+    ]
+}
+
+
+def _build_square_scores():
+    """Combines material and square bonuses into one table per (color, piece class), positive for WHITE and
+    negative for BLACK. Flipping the row of a square (square ^ 56) mirrors it for BLACK."""
+    scores = {}
+    for piece_type, table in PIECE_SQUARE_TABLES.items():
+        value = PIECE_VALUES[piece_type]
+        scores[('WHITE', piece_type)] = [value + table[square] for square in range(64)]
+        scores[('BLACK', piece_type)] = [-(value + table[square ^ 56]) for square in range(64)]
+    return scores
+
+
+SQUARE_SCORES = _build_square_scores()
+
+
+def piece_score(piece, square):
+    """Returns what a piece on the given square index adds to the evaluation, from WHITE's point of view."""
+    return SQUARE_SCORES[(piece.get_color(), type(piece))][square]
+
+
+def full_score(game):
+    """Computes the evaluation of a whole position from scratch, from WHITE's point of view. ChessGame keeps the same
+    number up to date move by move, so this is only needed to check it."""
+    return sum(piece_score(piece, square) for square, piece in enumerate(game.get_mailbox()) if piece is not None)
+
+
+def evaluate(game):
+    """Returns the evaluation of the position from the point of view of the player whose turn it is."""
+    score = game.get_score()
+    return score if game.get_player_turn() == 'WHITE' else -score
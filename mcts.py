@@ -0,0 +1,152 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Monte Carlo tree search built on ChessGame.playout(). Each iteration walks down the tree with UCT,
+# adds one new position, finishes the game with random moves and credits the result back up the path. Run directly
+# to measure playouts/second or to pick a move, e.g.
+#   python3 mcts.py --playouts 2000
+#   python3 mcts.py --iterations 5000
+
+import argparse
+import math
+import random
+import time
+
+from piece_classes import SQUARE_NAMES, MAX_MOVES
+from basic_chess import ChessGame
+
+EXPLORATION = 1.4    # UCT exploration constant; larger values try less visited moves more often
+
+
+class _Node:
+    """One position in the search tree, reached by playing move. wins counts results from the point of view of
+    mover, the player who played move: 1 per win and 0.5 per unfinished playout."""
+    __slots__ = ('move', 'parent', 'mover', 'children', 'untried', 'wins', 'visits')
+
+    def __init__(self, move, parent, mover, untried):
+        self.move = move
+        self.parent = parent
+        self.mover = mover
+        self.children = []
+        self.untried = untried
+        self.wins = 0.0
+        self.visits = 0
+
+    def select_child(self):
+        """Returns the child with the highest UCT score."""
+        log_visits = math.log(self.visits)
+        return max(self.children,
+                   key=lambda child: child.wins / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits))
+
+
+class MonteCarloSearcher:
+    """Runs Monte Carlo tree searches on a ChessGame and keeps statistics about the last search. Moves are pushed and
+    popped on the game itself, which is left in its original position afterwards."""
+    def __init__(self, max_moves=200, seed=None):
+        self._max_moves = max_moves    # playouts still running after this many moves count as unfinished
+        self._rng = random.Random(seed)
+        self._buffer = [0] * MAX_MOVES
+        self._stats = {}
+
+    def _untried_moves(self, game):
+        """Returns a list of every move in the game's current position."""
+        return self._buffer[:game.generate_moves(self._buffer)]
+
+    def search(self, game, iterations=1000, time_limit=None):
+        """Returns the (from, to) move in chess notation, e.g. ('e2', 'e4'), that was visited most after the given
+        number of iterations or time_limit seconds, whichever comes first, or None if the game is over. At least one
+        iteration always runs, so a move is returned whenever the game is not over."""
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit is not None else None
+        root = _Node(0, None, None, self._untried_moves(game))
+        if not root.untried:
+            return None
+
+        iterations = max(iterations, 1)
+        completed = 0
+        while completed < iterations and (completed == 0 or deadline is None or time.perf_counter() < deadline):
+            node = root
+            played = 0
+
+            # selection: follow UCT down through fully expanded positions
+            while not node.untried and node.children:
+                node = node.select_child()
+                game.push(node.move)
+                played += 1
+
+            # expansion: add one untried move, unless the game ended on the way down
+            if node.untried:
+                move = node.untried.pop(self._rng.randrange(len(node.untried)))
+                mover = game.get_player_turn()
+                game.push(move)
+                played += 1
+                child = _Node(move, node, mover, self._untried_moves(game))
+                node.children.append(child)
+                node = child
+
+            # simulation and backpropagation
+            result = game.playout(self._rng, self._max_moves, self._buffer)
+            while node is not None:
+                node.visits += 1
+                if result == 'UNFINISHED':
+                    node.wins += 0.5
+                elif node.mover is not None and result.startswith(node.mover):
+                    node.wins += 1
+                node = node.parent
+
+            for _ in range(played):
+                game.pop()
+            completed += 1
+
+        elapsed = time.perf_counter() - start
+        best = max(root.children, key=lambda child: child.visits)
+        self._stats = {'iterations': completed, 'visits': best.visits, 'win_rate': best.wins / best.visits,
+                       'time': elapsed, 'playouts_per_second': completed / elapsed if elapsed > 0 else 0}
+        return SQUARE_NAMES[best.move & 63], SQUARE_NAMES[best.move >> 6 & 63]
+
+    def get_stats(self):
+        """Returns a dictionary with the iterations run, the visits and win rate of the chosen move, and the time and
+        playouts/second of the last search."""
+        return self._stats
+
+
+def measure_playouts(game, playouts=1000, max_moves=200, seed=None):
+    """Runs the given number of random playouts from the game's position and returns (results, playouts/second),
+    where results counts each final game state."""
+    rng = random.Random(seed)
+    buffer = [0] * MAX_MOVES
+    results = {'UNFINISHED': 0, 'WHITE_WON': 0, 'BLACK_WON': 0}
+
+    start = time.perf_counter()
+    for _ in range(playouts):
+        results[game.playout(rng, max_moves, buffer)] += 1
+    elapsed = time.perf_counter() - start
+    return results, playouts / elapsed if elapsed > 0 else 0
+
+
+def main():
+    """Measures playout speed from the starting position, or runs a search there and prints the chosen move."""
+    parser = argparse.ArgumentParser(description='Random playouts and Monte Carlo tree search for basic_chess.')
+    parser.add_argument('--playouts', type=int, help='run this many random playouts and report playouts/second')
+    parser.add_argument('--iterations', type=int, default=1000, help='search iterations when choosing a move')
+    parser.add_argument('--time-limit', type=float, help='seconds to search for (iterations is still the maximum)')
+    parser.add_argument('--max-moves', type=int, default=200, help='moves after which a playout counts as unfinished')
+    parser.add_argument('--seed', type=int, help='seed for the random moves')
+    args = parser.parse_args()
+
+    game = ChessGame(headless=True)
+    if args.playouts is not None:
+        results, playouts_per_second = measure_playouts(game, args.playouts, args.max_moves, args.seed)
+        for state, count in results.items():
+            print(f"{state}: {count}")
+        print(f"Playouts/second: {playouts_per_second:,.0f}")
+    else:
+        searcher = MonteCarloSearcher(args.max_moves, args.seed)
+        move = searcher.search(game, args.iterations, args.time_limit)
+        stats = searcher.get_stats()
+        print(f"Best move: {move[0]} {move[1]}")
+        print(f"Iterations: {stats['iterations']}, visits: {stats['visits']}, win rate: {stats['win_rate']:.3f}")
+        print(f"Playouts/second: {stats['playouts_per_second']:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Bounded cache of generated moves keyed by position. Because the key is the position's Zobrist key,
+# any change to the board gives a new key, so cached entries never need to be invalidated by hand.
+
+from collections import OrderedDict
+
+
+class MoveCache:
+    """Least-recently-used cache mapping (position key, origin square) to the tuple of destination squares for the
+    piece on that square. One cache can be shared by many ChessGame objects, since equal positions have equal keys."""
+    def __init__(self, max_entries=65536):
+        if max_entries < 1:
+            raise ValueError("MoveCache needs room for at least one entry")
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key, square):
+        """Returns the cached moves for the piece on square in the position with the given key, or None."""
+        moves = self._entries.get((key, square))
+        if moves is None:
+            self._misses += 1
+            return None
+        self._entries.move_to_end((key, square))
+        self._hits += 1
+        return moves
+
+    def store(self, key, square, moves):
+        """Stores the moves for the piece on square, evicting the least recently used entry when full."""
+        self._entries[(key, square)] = moves
+        self._entries.move_to_end((key, square))
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Empties the cache and resets the hit/miss counts."""
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+
+    def get_stats(self):
+        """Returns a dictionary with the number of entries, hits and misses so far."""
+        return {'entries': len(self._entries), 'hits': self._hits, 'misses': self._misses}
+
+    def __len__(self):
+        return len(self._entries)
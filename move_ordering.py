@@ -0,0 +1,75 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Move ordering for the search. Alpha-beta prunes the most when the best move is tried first, so moves
+# are sorted with the transposition table's best move first, then captures (most valuable victim, then least valuable
+# attacker), then killer moves that caused a cutoff at the same ply, then quiet moves by how often they have caused
+# cutoffs anywhere (the history table).
+
+from piece_classes import Pawn, Rook, Knight, Bishop, Queen, King, MOVE_CAPTURE
+
+# capturing the King wins the game on the spot, so it outranks every other victim; as an attacker the King is
+# ranked last, since in this variant walking it into the open is how games are lost
+VICTIM_RANKS = {Pawn: 1, Knight: 2, Bishop: 3, Rook: 4, Queen: 5, King: 100}
+ATTACKER_RANKS = {Pawn: 1, Knight: 2, Bishop: 3, Rook: 4, Queen: 5, King: 6}
+
+HASH_MOVE_ORDER = 1 << 31    # the best move from an earlier search of the position sorts above everything
+CAPTURE_ORDER = 1 << 30    # captures sort above killers, which sort above any history score
+KILLER_ORDER = 1 << 28
+HISTORY_LIMIT = 1 << 27    # history scores are halved when one would pass this, keeping them below killers
+
+
+class MoveOrderer:
+    """Keeps the killer moves and history table for one search and sorts generated moves with them. Moves are the
+    encoded ints written by ChessGame.generate_moves."""
+    def __init__(self, max_ply=128):
+        self._killers = [[0, 0] for _ in range(max_ply + 1)]
+        self._history = [0] * 4096    # indexed by the from and to squares of a move (its low 12 bits)
+
+    def clear(self):
+        """Forgets all killer moves and history, e.g. before searching a new position."""
+        for killers in self._killers:
+            killers[0] = killers[1] = 0
+        self._history = [0] * 4096
+
+    def order(self, game, buffer, count, ply, hash_move=0):
+        """Returns the first count moves of buffer as a new list, best candidates first. hash_move is the best move
+        stored for this position in a transposition table, if there is one."""
+        squares = game.get_mailbox()
+        first_killer, second_killer = self._killers[ply]
+        history = self._history
+
+        scored = []
+        for index in range(count):
+            move = buffer[index]
+            if move == hash_move:
+                score = HASH_MOVE_ORDER
+            elif move & MOVE_CAPTURE:
+                victim = squares[move >> 6 & 63]
+                attacker = squares[move & 63]
+                score = CAPTURE_ORDER + VICTIM_RANKS[type(victim)] * 8 - ATTACKER_RANKS[type(attacker)]
+            elif move == first_killer:
+                score = KILLER_ORDER + 1
+            elif move == second_killer:
+                score = KILLER_ORDER
+            else:
+                score = history[move & 4095]
+            scored.append((score, move))
+
+        scored.sort(reverse=True)
+        return [move for _, move in scored]
+
+    def record_cutoff(self, move, ply, depth):
+        """Records that a move caused a beta cutoff at the given ply with the given remaining depth. Captures are
+        already ordered first, so only quiet moves become killers and gain history."""
+        if move & MOVE_CAPTURE:
+            return
+
+        killers = self._killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        index = move & 4095
+        self._history[index] += depth * depth
+        if self._history[index] > HISTORY_LIMIT:
+            self._history = [score // 2 for score in self._history]
@@ -0,0 +1,67 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Perft (performance test) for move generation. Counts every leaf node reachable from a position to a
+# fixed depth and reports nodes/second, giving a reproducible throughput number for move generation.
+
+import time
+
+from piece_classes import SQUARE_NAMES, MAX_MOVES
+
+
+def perft(game, depth):
+    """Counts the leaf nodes reachable from the given game position in exactly depth moves. Moves are pushed and
+    popped on the game itself, so it is back in its original position afterwards."""
+    return _perft(game, depth, [[0] * MAX_MOVES for _ in range(depth + 1)])
+
+
+def _perft(game, depth, buffers):
+    """Recursive part of perft, generating each depth's moves into its own preallocated buffer."""
+    if depth == 0:
+        return 1
+
+    buffer = buffers[depth]
+    count = game.generate_moves(buffer)
+    if depth == 1:
+        return count
+
+    nodes = 0
+    for index in range(count):
+        game.push(buffer[index])
+        nodes += _perft(game, depth - 1, buffers)
+        game.pop()
+    return nodes
+
+
+def perft_divide(game, depth):
+    """Returns a dictionary mapping each root move (e.g. 'e2e4') to the number of leaf nodes below it."""
+    results = {}
+    for move_from, move_to in game.get_move_squares():
+        game.push((move_from, move_to))
+        results[SQUARE_NAMES[move_from] + SQUARE_NAMES[move_to]] = perft(game, depth - 1)
+        game.pop()
+    return results
+
+
+def run_perft(game, depth, divide=False):
+    """Runs perft on the given game, printing the node count, elapsed time and nodes/second (and the count for each
+    root move when divide is True). Returns the total node count."""
+    start = time.perf_counter()
+    if divide and depth > 0:
+        results = perft_divide(game, depth)
+        nodes = sum(results.values())
+    else:
+        results = {}
+        nodes = perft(game, depth)
+    elapsed = time.perf_counter() - start
+
+    for move, count in results.items():
+        print(f"{move}: {count}")
+    if results:
+        print()
+
+    nodes_per_second = nodes / elapsed if elapsed > 0 else 0
+    print(f"Depth: {depth}")
+    print(f"Nodes: {nodes}")
+    print(f"Time: {elapsed:.3f}s")
+    print(f"Nodes/second: {nodes_per_second:,.0f}")
+    return nodes
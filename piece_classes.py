@@ -2,277 +2,316 @@
 # GitHub: https://github.com/cascad1an
 # Description: This file defines all chess piece classes, including their movement rules and Unicode representations.
 
-class Pawn:
-    """This class represents a Pawn piece with movement, capture logic, and Unicode rendering."""
+# squares are numbered 0..63 starting at a8 and ending at h1, matching the (col, row) layout of
+# ChessGame.coord_to_index, so square = row * 8 + col. Move generation works on these numbers only; chess notation
+# like 'e2' is only used when talking to the player.
+SQUARE_NAMES = [chr(97 + col) + str(8 - row) for row in range(8) for col in range(8)]
+SQUARE_INDEX = {name: index for index, name in enumerate(SQUARE_NAMES)}
+
+# moves are packed into a single int: the from square in bits 0-5, the to square in bits 6-11 and flags above that
+MOVE_CAPTURE = 1 << 12
+MOVE_KING_CAPTURE = 1 << 13    # always set together with MOVE_CAPTURE; the move ends the game
+MAX_MOVES = 256    # more than the most moves one side can ever have, so a buffer this size never overflows
+
+
+def _build_step_table(steps):
+    """Builds a table listing, for every square, the squares reachable from it with one of the given (col, row)
+    steps, skipping any that fall off the board. Used for pieces that move a fixed distance."""
+    table = []
+    for square in range(64):
+        targets = []
+        for col_step, row_step in steps:
+            to_col = square % 8 + col_step
+            to_row = square // 8 + row_step
+            if 0 <= to_col < 8 and 0 <= to_row < 8:
+                targets.append(to_row * 8 + to_col)
+        table.append(tuple(targets))
+    return table
+
+
+def _build_ray_table(directions):
+    """Builds a table listing, for every square, one ray per direction, each ray being the squares in order moving
+    outward from that square until the edge of the board. Used for sliding pieces."""
+    table = []
+    for square in range(64):
+        rays = []
+        for col_step, row_step in directions:
+            ray = []
+            to_col = square % 8 + col_step
+            to_row = square // 8 + row_step
+            while 0 <= to_col < 8 and 0 <= to_row < 8:
+                ray.append(to_row * 8 + to_col)
+                to_col += col_step
+                to_row += row_step
+            if ray:
+                rays.append(tuple(ray))
+        table.append(tuple(rays))
+    return table
+
+
+def _generate_sliding(piece, rays, buffer, count):
+    """Shared move generation for Rook, Bishop and Queen. Each ray stops at the first occupied square, which is
+    only included when it holds an opponent's piece."""
+    squares = piece._board.get_mailbox()
+    origin = piece._square
+    color = piece._color
+
+    for ray in rays[origin]:
+        for target in ray:
+            occupant = squares[target]
+            if occupant is None:
+                buffer[count] = origin | target << 6
+                count += 1
+            else:
+                if occupant._color != color:
+                    buffer[count] = origin | target << 6 | occupant._capture_flags
+                    count += 1
+                break
+
+    return count
+
+
+def _generate_steps(piece, table, buffer, count):
+    """Shared move generation for Knight and King: every table entry that is empty or holds an opponent's piece."""
+    squares = piece._board.get_mailbox()
+    origin = piece._square
+    for target in table[origin]:
+        occupant = squares[target]
+        if occupant is None:
+            buffer[count] = origin | target << 6
+            count += 1
+        elif occupant._color != piece._color:
+            buffer[count] = origin | target << 6 | occupant._capture_flags
+            count += 1
+
+    return count
+
+
+def _generate_sliding_captures(piece, rays, buffer, count):
+    """Capture-only version of _generate_sliding: only the first blocker on each ray is looked at, and it is written
+    out only when it holds an opponent's piece."""
+    squares = piece._board.get_mailbox()
+    origin = piece._square
+    color = piece._color
+
+    for ray in rays[origin]:
+        for target in ray:
+            occupant = squares[target]
+            if occupant is not None:
+                if occupant._color != color:
+                    buffer[count] = origin | target << 6 | occupant._capture_flags
+                    count += 1
+                break
+
+    return count
+
+
+def _generate_step_captures(piece, table, buffer, count):
+    """Capture-only version of _generate_steps."""
+    squares = piece._board.get_mailbox()
+    origin = piece._square
+    for target in table[origin]:
+        occupant = squares[target]
+        if occupant is not None and occupant._color != piece._color:
+            buffer[count] = origin | target << 6 | occupant._capture_flags
+            count += 1
+
+    return count
+
+
+class Piece:
+    """Shared base for all pieces. Slotted, so each of the 32 pieces on a board carries only its color, square, first
+    move flag and board reference instead of a per-instance __dict__. Subclasses set _symbols to their (white, black)
+    Unicode characters and define generate_moves() and generate_captures(), which write encoded moves into a buffer
+    starting at index count and return the new count."""
+    __slots__ = ('_color', '_square', '_board', '_init_move')
+    _symbols = (' ', ' ')
+    _capture_flags = MOVE_CAPTURE    # flags for a move that captures this piece
+
     def __init__(self, color, position, board):
-        self._init_move = True
+        self._init_move = True    # only pawns care whether they have moved yet
         self._color = color
-        self._position = position
+        self._square = SQUARE_INDEX[position.lower()]
         self._board = board
 
     def get_color(self):
         """Getter method for color"""
         return self._color
 
+    def get_position(self):
+        """Returns the piece's square in chess notation, e.g. 'e2'."""
+        return SQUARE_NAMES[self._square]
+
+    def unicode(self):
+        """Map unicode to piece"""
+        return self._symbols[0] if self._color == 'WHITE' else self._symbols[1]
+
     def valid_moves(self):
+        """Returns the squares this piece can move to in chess notation, e.g. ['e3', 'e4']."""
+        return [SQUARE_NAMES[square] for square in self.valid_squares()]
+
+    def valid_squares(self):
+        """Returns the square indexes this piece can move to. The buffer is allocated per call so that games in
+        different threads never share one."""
+        buffer = [0] * MAX_MOVES
+        count = self.generate_moves(buffer, 0)
+        return [buffer[index] >> 6 & 63 for index in range(count)]
+
+
+# destination squares for every origin square, built once at import so Knight and King moves are a table lookup
+KNIGHT_MOVES = _build_step_table([(2, 1), (1, 2), (-1, 2), (-2, 1), (-2, -1), (-1, -2), (1, -2), (2, -1)])
+KING_MOVES = _build_step_table([(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)])
+
+# (col, row) directions for the sliding pieces, and the rays they trace from every square
+ROOK_DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+BISHOP_DIRECTIONS = ((-1, 1), (1, 1), (-1, -1), (1, -1))
+QUEEN_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+ROOK_RAYS = _build_ray_table(ROOK_DIRECTIONS)
+BISHOP_RAYS = _build_ray_table(BISHOP_DIRECTIONS)
+QUEEN_RAYS = _build_ray_table(QUEEN_DIRECTIONS)
+
+
+class Pawn(Piece):
+    """This class represents a Pawn piece with movement, capture logic, and Unicode rendering."""
+    __slots__ = ()
+    _symbols = ('\u2659', '\u265F')
+
+    def generate_moves(self, buffer, count):
         """
         Movement: Moves forward one square. Can move forward two squares on its first move.
         Capture Style: Captures one square diagonally forward.
         Restrictions: Cannot move backward. Cannot move forward into an occupied square. Cannot capture forward.
         """
-        valid_moves = []
-        start_col, start_row = self._board.coord_to_index(self._position)
-        direction = 1 if self._color == 'WHITE' else -1         # pawns cannot move backwards
+        squares = self._board.get_mailbox()
+        origin = self._square
+        forward = origin - 8 if self._color == 'WHITE' else origin + 8    # pawns cannot move backwards
 
-        forward_reg = start_row - direction
-        if 8 > forward_reg >= 0:
-            move_forward = self._board.index_to_coord(start_col, forward_reg)
-            if self._board.is_square_open(move_forward):
-                valid_moves.append(move_forward)
+        if 0 <= forward < 64:
+            if squares[forward] is None:
+                buffer[count] = origin | forward << 6
+                count += 1
 
             if self._init_move:
-                forward_move1 = start_row - (2 * direction)
                 # initial move for pawn can move forward two squares (i.e. 2 * default dir)
-                if 8 > forward_move1 >= 0:
-                    forward_move1 = self._board.index_to_coord(start_col, forward_move1)
-                    if self._board.is_square_open(forward_move1):
-                        valid_moves.append(forward_move1)
-
-        for diagonal in [-1, 1]:
-            cap_col = start_col + diagonal
-            if 0 <= cap_col < 8:
-                cap_pos = self._board.index_to_coord(cap_col, forward_reg)
-                if self._board.is_opponent(cap_pos, self._color):
-                    valid_moves.append(cap_pos)
-
-        return valid_moves
-
-    def unicode(self):
-        """Map unicode to piece"""
-        if self._color == 'WHITE':
-            return '\u2659'
-        else:
-            return '\u265F'
-
-
-class Rook:
+                forward_two = forward - 8 if self._color == 'WHITE' else forward + 8
+                if 0 <= forward_two < 64 and squares[forward_two] is None:
+                    buffer[count] = origin | forward_two << 6
+                    count += 1
+
+            col = origin % 8
+            for diagonal in [-1, 1]:
+                if 0 <= col + diagonal < 8:
+                    occupant = squares[forward + diagonal]
+                    if occupant is not None and occupant._color != self._color:
+                        buffer[count] = origin | (forward + diagonal) << 6 | occupant._capture_flags
+                        count += 1
+
+        return count
+
+    def generate_captures(self, buffer, count):
+        """Writes only this pawn's diagonal captures."""
+        squares = self._board.get_mailbox()
+        origin = self._square
+        forward = origin - 8 if self._color == 'WHITE' else origin + 8
+
+        if 0 <= forward < 64:
+            col = origin % 8
+            for diagonal in [-1, 1]:
+                if 0 <= col + diagonal < 8:
+                    occupant = squares[forward + diagonal]
+                    if occupant is not None and occupant._color != self._color:
+                        buffer[count] = origin | (forward + diagonal) << 6 | occupant._capture_flags
+                        count += 1
+
+        return count
+
+
+class Rook(Piece):
     """This class represents a Rook piece with movement, capture logic, and Unicode rendering."""
-    def __init__(self, color, position, board):
-        self._color = color
-        self._position = position
-        self._board = board
-
-    def get_color(self):
-        """Getter method for color"""
-        return self._color
-
-    def unicode(self):
-        """Map unicode to piece"""
-        if self._color == 'WHITE':
-            return '\u2656'
-        else:
-            return '\u265C'
+    __slots__ = ()
+    _symbols = ('\u2656', '\u265C')
 
-    def valid_moves(self):
+    def generate_moves(self, buffer, count):
         """
         Movement: Can move any number of vacant squares vertically or horizontally.
         Capture Style: Same as movement; captures by landing on an opponent’s piece along the same rank or file.
         Restrictions: Cannot jump over other pieces; movement is blocked by any intervening pieces.
         """
-        valid_moves = []
-        start_col, start_row = self._board.coord_to_index(self._position)
-        direction = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        return _generate_sliding(self, ROOK_RAYS, buffer, count)
 
-        for diag_col, diag_row in direction:
-            for move in range(1, 8):
-                to_col = start_col + (diag_col * move)
-                to_row = start_row + (diag_row * move)
-                if not (0 <= to_col < 8 and 0 <= to_row < 8):
-                    break
+    def generate_captures(self, buffer, count):
+        """Writes only this rook's captures."""
+        return _generate_sliding_captures(self, ROOK_RAYS, buffer, count)
 
-                next_pos = self._board.index_to_coord(to_col, to_row)
-                if self._board.is_square_open(next_pos):
-                    valid_moves.append(next_pos)
-                # SOME CAPTURE LOGIC
-                elif self._board.is_opponent(next_pos, self._color):
-                    valid_moves.append(next_pos)
 
-        return valid_moves
-
-
-class Knight:
+class Knight(Piece):
     """This class represents a Knight piece with movement, capture logic, and Unicode rendering."""
-    def __init__(self, color, position, board):
-        self._color = color
-        self._position = position
-        self._board = board
-
-    def get_color(self):
-        """Getter method for color"""
-        return self._color
+    __slots__ = ()
+    _symbols = ('\u2658', '\u265E')
 
-    def unicode(self):
-        """Map unicode to piece"""
-        if self._color == 'WHITE':
-            return '\u2658'
-        else:
-            return '\u265E'
-
-    def valid_moves(self):
+    def generate_moves(self, buffer, count):
         """
         Movement: Moves in an L shape (two squares in one direction and then one square perpendicular to that).
         Capture Style: Same as movement; captures by landing on a square occupied by an opponent’s piece.
         Restrictions: Can jump over other pieces; movement is not blocked by intervening pieces.
         """
-        valid_moves = []
-        start_col, start_row = self._board.coord_to_index(self._position)
-
-        direction = [(2, 1), (1, 2), (-1, 2), (-2, 1),
-                  (-2, -1), (-1, -2), (1, -2), (2, -1)]
+        return _generate_steps(self, KNIGHT_MOVES, buffer, count)
 
-        for col, row in direction:
-            to_col = start_col + col
-            to_row = start_row + row
+    def generate_captures(self, buffer, count):
+        """Writes only this knight's captures."""
+        return _generate_step_captures(self, KNIGHT_MOVES, buffer, count)
 
-            if 0 <= to_col < 8 and 0 <= to_row < 8:
-                pos = self._board.index_to_coord(to_col, to_row)
-                if self._board.is_square_open(pos) or self._board.is_opponent(pos, self._color):
-                    valid_moves.append(pos)
 
-        return valid_moves
-
-
-class Bishop:
+class Bishop(Piece):
     """This class represents a Bishop piece with movement, capture logic, and Unicode rendering."""
-    def __init__(self, color, position, board):
-        self._color = color
-        self._position = position
-        self._board = board
-
-    def get_color(self):
-        """Getter method for color"""
-        return self._color
-
-    def unicode(self):
-        """Map unicode to piece"""
-        if self._color == 'WHITE':
-            return '\u2657'
-        else:
-            return '\u265D'
+    __slots__ = ()
+    _symbols = ('\u2657', '\u265D')
 
-    def valid_moves(self):
+    def generate_moves(self, buffer, count):
         """
         Movement: Can move any number of vacant squares diagonally.
         Capture Style: Same as movement; captures by moving to diagonally adjacent square occupied by opponent's piece.
         Restrictions: Cannot jump over other pieces; movement is limited to unobstructed diagonal paths.
         """
-        valid_moves = []
-        start_col, start_row = self._board.coord_to_index(self._position)
-
-        direction = [(-1, 1), (1, 1), (-1, -1), (1, -1)]
-        for coords in direction:
-            to_col, to_row = start_col, start_row
-            while True:
-                to_col += coords[0]
-                to_row += coords[1]
-                # more board logic/validation checking bounds
-                if not (7 >= to_col >= 0 and 7 >= to_row >= 0):
-                    break
-
-                target_pos = self._board.index_to_coord(to_col, to_row)
+        return _generate_sliding(self, BISHOP_RAYS, buffer, count)
 
-                if self._board.is_square_open(target_pos):
-                    valid_moves.append(target_pos)
-                elif self._board.is_opponent(target_pos, self._color):
-                    valid_moves.append(target_pos)
+    def generate_captures(self, buffer, count):
+        """Writes only this bishop's captures."""
+        return _generate_sliding_captures(self, BISHOP_RAYS, buffer, count)
 
-        return valid_moves
 
-
-class Queen:
+class Queen(Piece):
     """This class represents a Queen piece with movement, capture logic, and Unicode rendering."""
-    def __init__(self, color, position, board):
-        self._color = color
-        self._position = position
-        self._board = board
-
-    def get_color(self):
-        """Getter method for color"""
-        return self._color
+    __slots__ = ()
+    _symbols = ('\u2655', '\u265B')
 
-    def unicode(self):
-        """Map unicode to piece"""
-        if self._color == 'WHITE':
-            return '\u2655'
-        else:
-            return '\u265B'
-
-    def valid_moves(self):
+    def generate_moves(self, buffer, count):
         """
         Movement: The queen can move any number of squares in a straight line — vertically, horizontally, or diagonally.
         Capture Style: Same as movement; captures by moving to a square occupied by an opponent's piece.
         Restrictions: Cannot jump over other pieces; movement is blocked by the first piece in its path.
         """
-        valid_moves = []
-        start_col, start_row = self._board.coord_to_index(self._position)
-
-        direction = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
-        for coords in direction:
-            to_col, to_row = start_col, start_row
-
-            while True:
-                to_col += coords[0]
-                to_row += coords[1]
-
-                if not (7 >= to_col >= 0 and 7 >= to_row >= 0):
-                    break
+        return _generate_sliding(self, QUEEN_RAYS, buffer, count)
 
-                target_pos = self._board.index_to_coord(to_col, to_row)
+    def generate_captures(self, buffer, count):
+        """Writes only this queen's captures."""
+        return _generate_sliding_captures(self, QUEEN_RAYS, buffer, count)
 
-                if self._board.is_square_open(target_pos):
-                    valid_moves.append(target_pos)
-                elif self._board.is_opponent(target_pos, self._color):
-                    valid_moves.append(target_pos)
 
-        return valid_moves
-
-
-class King:
+class King(Piece):
     """This class represents a King piece with movement, capture logic, and Unicode rendering."""
-    def __init__(self, color, position, board):
-        self._color = color
-        self._position = position
-        self._board = board
+    __slots__ = ()
+    _symbols = ('\u2654', '\u265A')
+    _capture_flags = MOVE_CAPTURE | MOVE_KING_CAPTURE
 
-    def get_color(self):
-        """Getter method for color"""
-        return self._color
-
-    def unicode(self):
-        """Map unicode to piece"""
-        if self._color == 'WHITE':
-            return '\u2654'
-        else:
-            return '\u265A'
-
-    def valid_moves(self):
+    def generate_moves(self, buffer, count):
         """
         Movement: Can move exactly one square in any direction, vertically, horizontally, or diagonally.
         Capture Style: Same as movement; captures by moving to a square occupied by an opponent's piece.
         Restrictions: Cannot jump over other pieces; limited to one-square movement.
         """
+        return _generate_steps(self, KING_MOVES, buffer, count)
 
-        valid_moves = []
-        start_col, start_row = self._board.coord_to_index(self._position)
-
-        direction = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
-        for coords in direction:
-            to_col = start_col + coords[0]
-            to_row = start_row + coords[1]
-
-            if 0 <= to_col < 8 and 0 <= to_row < 8:
-                target_pos = self._board.index_to_coord(to_col, to_row)
-                if self._board.is_square_open(target_pos) or self._board.is_opponent(target_pos, self._color):
-                    valid_moves.append(target_pos)
-
-        return valid_moves
+    def generate_captures(self, buffer, count):
+        """Writes only this king's captures."""
+        return _generate_step_captures(self, KING_MOVES, buffer, count)
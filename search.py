@@ -0,0 +1,308 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Computer opponent. Finds a best move for the player whose turn it is using negamax alpha-beta search
+# with iterative deepening, a hard time limit and node-count statistics. Capturing a King wins immediately. At the
+# end of the main search a quiescence search keeps playing captures until the position is quiet, so a line is never
+# scored in the middle of an exchange. An optional shared transposition table lets searches, including the worker
+# processes of ParallelSearcher, reuse each other's results.
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from piece_classes import SQUARE_NAMES, MAX_MOVES, MOVE_KING_CAPTURE
+from evaluation import evaluate
+from move_ordering import MoveOrderer
+from transposition import SharedTranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from basic_chess import ChessGame
+
+WIN_SCORE = 1000000    # score for capturing the opposing King, reduced by the ply it happens at to prefer quick wins
+INFINITY = WIN_SCORE + 1
+MAX_PLY = 128    # deepest ply a search can reach; each ply gets its own preallocated move buffer
+WIN_THRESHOLD = WIN_SCORE // 2    # scores beyond this are King captures, not evaluations
+DEFAULT_DEPTH = 4    # depth searched when no max_depth is given, a fraction of a second from the starting position
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time limit has run out."""
+    pass
+
+
+class Searcher:
+    """Runs iterative-deepening alpha-beta searches on a ChessGame and keeps statistics about the last search.
+    Moves are pushed and popped on the game itself, which is left in its original position afterwards. table is an
+    optional transposition table (e.g. a SharedTranspositionTable) with probe() and store() methods."""
+    def __init__(self, check_every=1024, table=None):
+        self._check_every = check_every    # how many nodes between checks of the clock
+        self._table = table
+        self._nodes = 0
+        self._deadline = None
+        self._stats = {}
+        self._buffers = [[0] * MAX_MOVES for _ in range(MAX_PLY + 1)]
+        self._orderer = MoveOrderer(MAX_PLY)
+
+    def search(self, game, max_depth=DEFAULT_DEPTH, time_limit=None):
+        """Returns the best (from, to) move in chess notation, e.g. ('e2', 'e4'), for the player whose turn it is,
+        or None if the game is over. Searches depth 1, 2, ... up to max_depth, stopping once time_limit seconds have
+        passed; the move from the deepest completed depth is returned. Pass a larger max_depth together with a
+        time_limit to search for as long as the clock allows."""
+        start = time.perf_counter()
+        self._nodes = 0
+        self._deadline = start + time_limit if time_limit is not None else None
+        self._stats = {'depth': 0, 'score': 0, 'nodes': 0, 'time': 0.0, 'nodes_per_second': 0}
+
+        self._orderer.clear()
+        count = game.generate_moves(self._buffers[0])
+        if count == 0:
+            return None
+
+        moves = self._orderer.order(game, self._buffers[0], count, 0)
+        best_move = moves[0]
+        for depth in range(1, min(max_depth, MAX_PLY) + 1):
+            try:
+                score, move = self._search_root(game, moves, depth)
+            except SearchTimeout:
+                break
+            best_move = move
+            self._stats['depth'] = depth
+            self._stats['score'] = score
+
+            # search the best move first on the next iteration
+            moves.remove(move)
+            moves.insert(0, move)
+            if score >= WIN_SCORE - depth or score <= -WIN_SCORE + depth:
+                break    # a forced King capture was found, searching deeper cannot change the result
+
+        elapsed = time.perf_counter() - start
+        self._stats['nodes'] = self._nodes
+        self._stats['time'] = elapsed
+        self._stats['nodes_per_second'] = self._nodes / elapsed if elapsed > 0 else 0
+        return SQUARE_NAMES[best_move & 63], SQUARE_NAMES[best_move >> 6 & 63]
+
+    def get_stats(self):
+        """Returns a dictionary with the depth completed, its score, and the nodes, time and nodes/second of the
+        last search."""
+        return self._stats
+
+    def score_move(self, game, move, depth, deadline=None):
+        """Searches a single root move (encoded as by ChessGame.generate_moves) to the given depth and returns its
+        score for the player making it, or None if deadline (a time.time() value) passes first. The node count is
+        available from get_stats()['nodes'] afterwards."""
+        self._nodes = 0
+        if deadline is not None:
+            self._deadline = time.perf_counter() + (deadline - time.time())
+        else:
+            self._deadline = None
+
+        try:
+            score = self._search_move(game, move, depth, 1, -INFINITY, INFINITY)
+        except SearchTimeout:
+            score = None
+        self._stats = {'nodes': self._nodes}
+        return score
+
+    def _search_root(self, game, moves, depth):
+        """Searches every root move to the given depth and returns (best score, best move)."""
+        alpha = -INFINITY
+        best_move = moves[0]
+        for move in moves:
+            # each move only has to beat the best score so far, so the window is (alpha, +inf) for the mover;
+            # _search_move negates it to (-inf, -alpha) for the reply
+            score = self._search_move(game, move, depth, 1, alpha, INFINITY)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        return alpha, best_move
+
+    def _search_move(self, game, move, depth, ply, alpha, beta):
+        """Plays a move and returns its score for the player making it."""
+        if move & MOVE_KING_CAPTURE:
+            return WIN_SCORE - ply
+        game.push(move)
+        try:
+            if game.get_game_state() != 'UNFINISHED':
+                return WIN_SCORE - ply
+            return -self._negamax(game, depth - 1, ply + 1, -beta, -alpha)
+        finally:
+            game.pop()
+
+    def _negamax(self, game, depth, ply, alpha, beta):
+        """Returns the score of the position for the player whose turn it is, searched to the given depth."""
+        self._nodes += 1
+        if self._deadline is not None and self._nodes % self._check_every == 0:
+            if time.perf_counter() >= self._deadline:
+                raise SearchTimeout
+
+        if depth == 0:
+            return self._quiesce(game, ply, alpha, beta)
+
+        hash_move = 0
+        if self._table is not None:
+            entry = self._table.probe(game.position_key())
+            if entry is not None:
+                entry_depth, bound, score, hash_move = entry
+                if entry_depth >= depth:
+                    score = _score_from_table(score, ply)
+                    if bound == EXACT or (bound == LOWER_BOUND and score >= beta) or \
+                            (bound == UPPER_BOUND and score <= alpha):
+                        return score
+
+        original_alpha = alpha
+        buffer = self._buffers[ply]
+        count = game.generate_moves(buffer)
+        best = -INFINITY
+        best_move = 0
+        for move in self._orderer.order(game, buffer, count, ply, hash_move):
+            score = self._search_move(game, move, depth, ply, alpha, beta)
+            if score > best:
+                best = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self._orderer.record_cutoff(move, ply, depth)
+                        break
+
+        if best == -INFINITY:
+            best = 0    # no moves available; nothing to gain or lose
+
+        if self._table is not None:
+            if best <= original_alpha:
+                bound = UPPER_BOUND
+            elif best >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            self._table.store(game.position_key(), depth, bound, _score_to_table(best, ply), best_move)
+        return best
+
+    def _quiesce(self, game, ply, alpha, beta):
+        """Returns the score of the position for the player whose turn it is, searching only captures. The player may
+        also decline to capture (stand pat), so the static evaluation is a lower bound on the score."""
+        self._nodes += 1
+        if self._deadline is not None and self._nodes % self._check_every == 0:
+            if time.perf_counter() >= self._deadline:
+                raise SearchTimeout
+
+        stand_pat = evaluate(game)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        buffer = self._buffers[ply]
+        count = game.generate_captures(buffer)
+        for move in self._orderer.order(game, buffer, count, ply):
+            if move & MOVE_KING_CAPTURE:
+                return WIN_SCORE - ply
+            game.push(move)
+            try:
+                score = -self._quiesce(game, ply + 1, -beta, -alpha)
+            finally:
+                game.pop()
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
+
+
+def _score_to_table(score, ply):
+    """King capture scores count plies from the root; the table stores them counted from the position instead, so an
+    entry stays correct when the position is reached at a different ply."""
+    if score > WIN_THRESHOLD:
+        return score + ply
+    if score < -WIN_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    """Undoes _score_to_table for a position found at the given ply."""
+    if score > WIN_THRESHOLD:
+        return score - ply
+    if score < -WIN_THRESHOLD:
+        return score + ply
+    return score
+
+
+def find_best_move(game, max_depth=DEFAULT_DEPTH, time_limit=None):
+    """Convenience wrapper returning (best move, search statistics) for the player whose turn it is."""
+    searcher = Searcher()
+    move = searcher.search(game, max_depth, time_limit)
+    return move, searcher.get_stats()
+
+
+def _score_root_move(snapshot, move, depth, deadline, table=None):
+    """Worker process entry point: scores one root move and returns (score or None, nodes searched). Workers receive
+    the position as a ChessGame snapshot rather than the game object with every piece's back-reference to it, and
+    the shared transposition table as its name, attaching to the same memory as every other worker."""
+    game = ChessGame.from_snapshot(snapshot, headless=True)
+    searcher = Searcher(table=table)
+    score = searcher.score_move(game, move, depth, deadline)
+    return score, searcher.get_stats()['nodes']
+
+
+class ParallelSearcher:
+    """Splits the root moves of each iterative-deepening pass across a pool of worker processes. Each worker scores
+    its moves independently with a full window, so some pruning is lost compared to Searcher, in exchange for
+    using every core. All workers share one transposition table in shared memory, so a position searched by one
+    worker, or at an earlier depth, is not searched again by another. Use as a context manager, or call close() when
+    done, to shut the pool down and free the table."""
+    def __init__(self, workers=None, table_entries=1 << 20):
+        self._table = SharedTranspositionTable(table_entries)
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._stats = {}
+
+    def search(self, game, max_depth=DEFAULT_DEPTH, time_limit=None):
+        """Returns the best (from, to) move in chess notation for the player whose turn it is, or None if the game is
+        over. Works like Searcher.search, but a depth only counts as completed once every root move has been scored."""
+        start = time.perf_counter()
+        deadline = time.time() + time_limit if time_limit is not None else None
+        self._stats = {'depth': 0, 'score': 0, 'nodes': 0, 'time': 0.0, 'nodes_per_second': 0}
+
+        moves = [0] * MAX_MOVES
+        del moves[game.generate_moves(moves):]
+        if not moves:
+            return None
+
+        snapshot = game.snapshot()
+        best_move = moves[0]
+        nodes = 0
+        for depth in range(1, min(max_depth, MAX_PLY) + 1):
+            futures = [self._executor.submit(_score_root_move, snapshot, move, depth, deadline, self._table)
+                       for move in moves]
+            scores = []
+            for future in futures:
+                score, move_nodes = future.result()
+                nodes += move_nodes
+                scores.append(score)
+            if None in scores:
+                break    # ran out of time before every root move was scored at this depth
+
+            best_score = max(scores)
+            best_move = moves[scores.index(best_score)]
+            self._stats['depth'] = depth
+            self._stats['score'] = best_score
+            if best_score >= WIN_SCORE - depth or best_score <= -WIN_SCORE + depth:
+                break
+
+        elapsed = time.perf_counter() - start
+        self._stats['nodes'] = nodes
+        self._stats['time'] = elapsed
+        self._stats['nodes_per_second'] = nodes / elapsed if elapsed > 0 else 0
+        return SQUARE_NAMES[best_move & 63], SQUARE_NAMES[best_move >> 6 & 63]
+
+    def get_stats(self):
+        """Returns the same statistics as Searcher.get_stats, with nodes summed over all workers."""
+        return self._stats
+
+    def close(self):
+        """Shuts down the worker processes and frees the transposition table."""
+        self._executor.shutdown()
+        self._table.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
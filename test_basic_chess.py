@@ -0,0 +1,65 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Tests for the invariants search, perft and MCTS rely on: push/pop put the game back exactly, and the
+# incremental Zobrist key and evaluation always match a from-scratch computation. Run with
+#   python3 -m pytest test_basic_chess.py
+
+import random
+
+import pytest
+
+from piece_classes import MAX_MOVES
+from basic_chess import ChessGame
+from evaluation import full_score
+from perft import perft
+from zobrist import full_key
+
+
+def assert_incremental_state(game):
+    """Checks the incremental key and evaluation against values computed from the whole board."""
+    assert game.position_key() == full_key(game)
+    assert game.get_score() == full_score(game)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_push_pop_keep_key_and_score_in_sync(seed):
+    rng = random.Random(seed)
+    game = ChessGame(headless=True)
+    buffer = [0] * MAX_MOVES
+    start = game.snapshot()
+
+    pushed = 0
+    while pushed < 120 and game.get_game_state() == 'UNFINISHED':
+        count = game.generate_moves(buffer)
+        if count == 0:
+            break
+        game.push(buffer[rng.randrange(count)])
+        pushed += 1
+        assert_incremental_state(game)
+
+    for _ in range(pushed):
+        game.pop()
+        assert_incremental_state(game)
+
+    assert game.snapshot() == start
+
+
+@pytest.mark.parametrize('depth, nodes', [(1, 20), (2, 400), (3, 8982), (4, 201378)])
+def test_perft_from_start(depth, nodes):
+    game = ChessGame(headless=True)
+    start = game.snapshot()
+    assert perft(game, depth) == nodes
+    assert game.snapshot() == start
+
+
+def test_loaders_rebuild_the_same_position():
+    rng = random.Random(7)
+    game = ChessGame(headless=True)
+    buffer = [0] * MAX_MOVES
+    for _ in range(30):
+        game.push(buffer[rng.randrange(game.generate_moves(buffer))])
+
+    for copy in (ChessGame.from_snapshot(game.snapshot()), ChessGame.from_fen(game.to_fen())):
+        assert copy.snapshot() == game.snapshot()
+        assert copy.position_key() == game.position_key()
+        assert copy.get_score() == game.get_score()
@@ -0,0 +1,103 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Self-play tournament runner. Plays many engine or random games at once across a pool of worker
+# processes, counts the results by final game state and writes one JSON record per game. Each game opens with a few
+# random moves chosen from its seed and game number, so engine-vs-engine games differ from one another, e.g.
+#   python3 tournament.py --games 1000 --white engine --black random --depth 2 --output results.jsonl
+
+import argparse
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from piece_classes import SQUARE_NAMES, MAX_MOVES
+from basic_chess import ChessGame, GAME_STATES
+from search import Searcher
+
+PLAYERS = ('engine', 'random')
+
+
+def play_game(game_id, white='engine', black='random', depth=2, time_limit=None, max_moves=200, seed=0,
+              opening_plies=4):
+    """Plays one game between two players ('engine' or 'random') and returns its record as a dictionary. The first
+    opening_plies moves are random for both players, chosen from seed and game_id; the search is deterministic, so
+    without them every engine-vs-engine game would be the same game. A game still running after max_moves moves (by
+    both sides together, openings included) is stopped and recorded as 'UNFINISHED'."""
+    game = ChessGame(headless=True)
+    rng = random.Random(seed * 1000003 + game_id)
+    searcher = Searcher()
+    players = {'WHITE': white, 'BLACK': black}
+    buffer = [0] * MAX_MOVES
+    moves = []
+
+    start = time.perf_counter()
+    while game.get_game_state() == 'UNFINISHED' and len(moves) < max_moves:
+        count = game.generate_moves(buffer)
+        if count == 0:
+            break    # the side to move is stuck; nobody can win
+        if players[game.get_player_turn()] == 'engine' and len(moves) >= opening_plies:
+            move_from, move_to = searcher.search(game, depth, time_limit)
+        else:
+            move = buffer[rng.randrange(count)]
+            move_from, move_to = SQUARE_NAMES[move & 63], SQUARE_NAMES[move >> 6 & 63]
+        game.push((move_from, move_to))
+        moves.append(move_from + move_to)
+
+    return {'game': game_id, 'white': white, 'black': black, 'result': game.get_game_state(), 'plies': len(moves),
+            'time': round(time.perf_counter() - start, 4), 'moves': moves}
+
+
+def _play_game(args):
+    """Unpacks the arguments for play_game, for use with ProcessPoolExecutor.map."""
+    return play_game(*args)
+
+
+def run_tournament(games, white='engine', black='random', depth=2, time_limit=None, max_moves=200, seed=0,
+                   workers=None, output=None, opening_plies=4):
+    """Plays the given number of games across a pool of worker processes and returns a Counter of their results. If
+    output is given, each game's record is written to it as one line of JSON in the order the games were started."""
+    tasks = [(game_id, white, black, depth, time_limit, max_moves, seed, opening_plies) for game_id in range(games)]
+    results = Counter({state: 0 for state in GAME_STATES})
+    records = open(output, 'w') if output else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for record in executor.map(_play_game, tasks, chunksize=max(1, games // 64)):
+                results[record['result']] += 1
+                if records is not None:
+                    records.write(json.dumps(record) + '\n')
+    finally:
+        if records is not None:
+            records.close()
+    return results
+
+
+def main():
+    """Reads the tournament settings from the command line, plays the games and prints a summary."""
+    parser = argparse.ArgumentParser(description='Play many engine/random games in parallel and record the results.')
+    parser.add_argument('--games', type=int, default=100, help='number of games to play')
+    parser.add_argument('--white', choices=PLAYERS, default='engine', help='player for WHITE')
+    parser.add_argument('--black', choices=PLAYERS, default='random', help='player for BLACK')
+    parser.add_argument('--depth', type=int, default=2, help='search depth for the engine')
+    parser.add_argument('--time-limit', type=float, help='seconds per engine move (depth is still the maximum)')
+    parser.add_argument('--max-moves', type=int, default=200, help='moves after which a game is stopped unfinished')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per CPU)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the random players and openings')
+    parser.add_argument('--opening-plies', type=int, default=4, help='random moves played at the start of every game')
+    parser.add_argument('--output', help='file to write one JSON record per game to')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_tournament(args.games, args.white, args.black, args.depth, args.time_limit, args.max_moves,
+                             args.seed, args.workers, args.output, args.opening_plies)
+    elapsed = time.perf_counter() - start
+
+    for state in GAME_STATES:
+        print(f"{state}: {results[state]}")
+    print(f"Time: {elapsed:.3f}s")
+    print(f"Games/hour: {args.games / elapsed * 3600 if elapsed > 0 else 0:,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Transposition table kept in a multiprocessing.shared_memory block, so every search process reads and
+# writes the same table instead of each one rebuilding its own. Entries are found by a position's Zobrist key and hold
+# the depth searched, the score, whether the score is exact or a bound, and the best move found.
+
+import struct
+from multiprocessing import shared_memory
+
+# what a stored score means: the exact score, or only a lower or upper bound after an alpha-beta cutoff
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# each entry is two 64-bit words. The data word packs the score (offset to be non-negative) in bits 0-31, the best
+# move in bits 32-47, the depth in bits 48-55 and the bound in bits 56-57. The check word is the Zobrist key XOR the
+# data word, so an entry half-written by another process fails the key comparison and is simply treated as a miss.
+# That is what lets processes share the table without any locks.
+_ENTRY = struct.Struct('<QQ')
+_SCORE_OFFSET = 1 << 31
+
+
+class SharedTranspositionTable:
+    """A fixed-size transposition table in shared memory. The process that creates it owns the block and removes it
+    on close(); other processes attach to it by name, which happens automatically when the table is passed to a
+    worker process, since it pickles as its name and size only."""
+    def __init__(self, entries=1 << 20, name=None):
+        """Creates a new table with room for the given number of entries, or attaches to the existing table called
+        name, which must have been created with the same number of entries."""
+        self._entries = entries
+        self._owner = name is None
+        if self._owner:
+            self._memory = shared_memory.SharedMemory(create=True, size=entries * _ENTRY.size)
+            self._memory.buf[:entries * _ENTRY.size] = bytes(entries * _ENTRY.size)
+        else:
+            self._memory = shared_memory.SharedMemory(name=name)
+        self._buffer = self._memory.buf
+
+    def __reduce__(self):
+        return SharedTranspositionTable, (self._entries, self._memory.name)
+
+    def __len__(self):
+        return self._entries
+
+    def get_name(self):
+        """Returns the name other processes use to attach to the table."""
+        return self._memory.name
+
+    def probe(self, key):
+        """Returns (depth, bound, score, move) stored for the position with the given Zobrist key, or None if the
+        table has no entry for it."""
+        check, data = _ENTRY.unpack_from(self._buffer, key % self._entries * _ENTRY.size)
+        if check ^ data != key:
+            return None
+        return data >> 48 & 255, data >> 56, (data & 0xFFFFFFFF) - _SCORE_OFFSET, data >> 32 & 0xFFFF
+
+    def store(self, key, depth, bound, score, move):
+        """Stores a search result for the position with the given Zobrist key. A result for the same position
+        searched to a greater depth is kept in preference; a different position always takes the slot."""
+        offset = key % self._entries * _ENTRY.size
+        check, data = _ENTRY.unpack_from(self._buffer, offset)
+        if check ^ data == key and data >> 48 & 255 > depth:
+            return
+
+        data = (score + _SCORE_OFFSET) | move << 32 | depth << 48 | bound << 56
+        _ENTRY.pack_into(self._buffer, offset, key ^ data, data)
+
+    def clear(self):
+        """Empties the table for every process using it."""
+        self._buffer[:self._entries * _ENTRY.size] = bytes(self._entries * _ENTRY.size)
+
+    def close(self):
+        """Detaches from the shared memory, and frees it if this process created the table."""
+        self._buffer = None
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
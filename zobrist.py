@@ -0,0 +1,36 @@
+# Author: Derek Woodard
+# GitHub: https://github.com/cascad1an
+# Description: Zobrist hashing for ChessGame positions. Every piece on every square, the side to move and each pawn
+# that still has its two-square first move get a random 64-bit number; a position's key is the XOR of its numbers.
+
+import random
+
+from piece_classes import Pawn, Rook, Knight, Bishop, Queen, King
+
+# a fixed seed keeps keys identical between runs and between processes, so stored keys stay comparable
+_rng = random.Random(20240611)
+
+PIECE_KEYS = {(color, piece_type): [_rng.getrandbits(64) for _ in range(64)]
+              for color in ('WHITE', 'BLACK') for piece_type in (Pawn, Rook, Knight, Bishop, Queen, King)}
+UNMOVED_PAWN_KEYS = {color: [_rng.getrandbits(64) for _ in range(64)] for color in ('WHITE', 'BLACK')}
+BLACK_TO_MOVE_KEY = _rng.getrandbits(64)
+
+
+def piece_key(piece, square):
+    """Returns the key for a piece on the given square index, including whether a pawn still has its first move."""
+    key = PIECE_KEYS[(piece.get_color(), type(piece))][square]
+    if type(piece) is Pawn and piece._init_move:
+        key ^= UNMOVED_PAWN_KEYS[piece.get_color()][square]
+    return key
+
+
+def full_key(game):
+    """Computes the key for a whole game position from scratch. ChessGame keeps the same key up to date move by
+    move, so this is only needed to check it."""
+    key = 0
+    for square, piece in enumerate(game.get_mailbox()):
+        if piece is not None:
+            key ^= piece_key(piece, square)
+    if game.get_player_turn() == 'BLACK':
+        key ^= BLACK_TO_MOVE_KEY
+    return key